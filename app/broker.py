@@ -0,0 +1,292 @@
+import asyncio
+import json
+import os
+import queue
+import signal
+import socket
+import threading
+import time
+from typing import Any, List, Optional
+
+from .config import Settings
+from .events import EventBus
+from .journal import EventJournal, journal_from_settings
+from .robot_server import RobotEventServer
+
+
+# Multi-worker mode: one ingest process owns the robot listener and journal and
+# runs EventBroker on a Unix domain socket. Each uvicorn worker holds a
+# BrokerBus that forwards publishes to the broker and receives every event
+# back, so SSE clients on any worker see events from any source.
+#
+# Messages are newline-delimited JSON (json.dumps never emits a raw newline).
+# Worker -> broker: {"e": event, "r": record}. Broker -> worker: the event itself.
+
+
+def _dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _recv_lines(sock: socket.socket, buf: bytes) -> tuple[List[bytes], bytes]:
+    chunk = sock.recv(65536)
+    if not chunk:
+        raise ConnectionError("closed")
+    *lines, rest = (buf + chunk).split(b"\n")
+    return [line for line in lines if line.strip()], rest
+
+
+class _Client:
+    """One connected worker; a dedicated thread drains its send queue so a
+    stalled worker never blocks the robot listener or other workers."""
+
+    def __init__(self, conn: socket.socket, on_error) -> None:
+        self.conn = conn
+        self.q: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=1024)
+        self._on_error = on_error
+        threading.Thread(target=self._send_loop, daemon=True).start()
+
+    def send(self, line: bytes) -> bool:
+        try:
+            self.q.put_nowait(line)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self) -> None:
+        try:
+            self.q.put_nowait(None)
+        except queue.Full:
+            pass
+        self.conn.close()
+
+    def _send_loop(self) -> None:
+        while True:
+            line = self.q.get()
+            if line is None:
+                return
+            try:
+                self.conn.sendall(line)
+            except OSError as e:
+                self._on_error(self, e)
+                return
+
+
+class EventBroker(EventBus):
+    """Ingest-side bus: journals events and broadcasts them to connected workers."""
+
+    def __init__(self, path: str, journal: Optional[EventJournal] = None) -> None:
+        super().__init__(journal=journal)
+        self.path = path
+        self._clients: List[_Client] = []
+        self._lock = threading.Lock()
+        self._srv: Optional[socket.socket] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._srv.bind(self.path)
+        self._srv.listen(64)
+        self._srv.settimeout(1.0)
+        self._stop.clear()
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        print(f"[BROKER] listening {self.path}")
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for c in clients:
+            c.close()
+        if self._srv is not None:
+            self._srv.close()
+            self._srv = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        print("[BROKER] stopped")
+
+    def publish(self, data: Any, record: bool = True) -> None:
+        super().publish(data, record=record)
+        try:
+            line = _dumps(data)
+        except (TypeError, ValueError) as e:
+            print(f"[BROKER][encode][err] {e}")
+            return
+        with self._lock:
+            clients = list(self._clients)
+        for c in clients:
+            if not c.send(line):
+                # Worker is not keeping up; it reconnects on its own
+                self._drop(c, "send queue full")
+
+    def _drop(self, c: _Client, reason: Any) -> None:
+        with self._lock:
+            if c not in self._clients:
+                return
+            self._clients.remove(c)
+        print(f"[BROKER] drop worker: {reason}")
+        c.close()
+
+    def _accept_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._srv.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            conn.settimeout(2.0)
+            client = _Client(conn, self._drop)
+            with self._lock:
+                self._clients.append(client)
+            threading.Thread(target=self._read_loop, args=(client,), daemon=True).start()
+
+    def _read_loop(self, client: _Client) -> None:
+        # Events posted to /robot/event on any worker
+        buf = b""
+        while not self._stop.is_set():
+            try:
+                lines, buf = _recv_lines(client.conn, buf)
+            except socket.timeout:
+                continue
+            except (OSError, ConnectionError) as e:
+                self._drop(client, e)
+                return
+            for line in lines:
+                try:
+                    msg = json.loads(line)
+                    self.publish(msg["e"], record=bool(msg.get("r", True)))
+                except Exception as e:
+                    print(f"[BROKER][recv][err] {e}")
+
+
+class BrokerBus(EventBus):
+    """Worker-side bus: publishes go through the broker, broker events fan out locally."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+        self._sock: Optional[socket.socket] = None
+        # publish() runs on the worker's event loop, so it only enqueues; a
+        # sender thread does the blocking sendall. If the ingest process stalls
+        # the queue fills and events fall back to local delivery.
+        self._out: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=1024)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        # Must be called from the worker's event loop (FastAPI startup)
+        self._loop = asyncio.get_running_loop()
+        self._stop.clear()
+        threading.Thread(target=self._run, daemon=True).start()
+        threading.Thread(target=self._send_loop, daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        try:
+            self._out.put_nowait(None)
+        except queue.Full:
+            pass
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            sock.close()
+
+    def publish(self, data: Any, record: bool = True) -> None:
+        if self._sock is None:
+            print("[BROKER][bus][warn] not connected; delivering locally only")
+            self._deliver(data)
+            return
+        try:
+            line = _dumps({"e": data, "r": record})
+        except (TypeError, ValueError) as e:
+            print(f"[BROKER][bus][encode][err] {e}")
+            return
+        try:
+            self._out.put_nowait((data, line))
+        except queue.Full:
+            print("[BROKER][bus][warn] broker not keeping up; delivering locally only")
+            self._deliver(data)
+
+    def _send_loop(self) -> None:
+        while True:
+            item = self._out.get()
+            if item is None:
+                return
+            data, line = item
+            sock = self._sock
+            if sock is None:
+                self._deliver(data)
+                continue
+            try:
+                sock.sendall(line)
+            except OSError as e:
+                print(f"[BROKER][bus][send][err] {e}")
+                self._deliver(data)
+
+    def _deliver(self, data: Any) -> None:
+        # Queues belong to the worker's loop; hop onto it from the reader thread
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(EventBus.publish, self, data, False)
+
+    def _run(self) -> None:
+        delay = 0.1
+        while not self._stop.is_set():
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                # Ingest process may still be starting
+                sock.close()
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
+                continue
+            delay = 0.1
+            self._sock = sock
+            print(f"[BROKER][bus] connected {self.path}")
+            buf = b""
+            try:
+                while not self._stop.is_set():
+                    lines, buf = _recv_lines(sock, buf)
+                    for line in lines:
+                        try:
+                            self._deliver(json.loads(line))
+                        except Exception as e:
+                            print(f"[BROKER][bus][recv][err] {e}")
+            except (OSError, ConnectionError) as e:
+                if not self._stop.is_set():
+                    print(f"[BROKER][bus] disconnected: {e}")
+            finally:
+                self._sock = None
+                sock.close()
+
+
+def run_ingest(settings: Settings) -> None:
+    """Entry point of the ingest process: robot listener + journal + broker."""
+    journal = journal_from_settings(settings)
+    broker = EventBroker(settings.event_broker_socket, journal=journal)
+    server = RobotEventServer(
+        host=settings.event_listen_host,
+        port=settings.event_listen_port,
+        transport=settings.event_transport,
+        bus=broker,
+    )
+
+    done = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: done.set())
+    signal.signal(signal.SIGINT, lambda *_: done.set())
+
+    if journal is not None:
+        journal.start()
+    broker.start()
+    server.start()
+    try:
+        while not done.wait(1.0):
+            pass
+    finally:
+        server.stop()
+        broker.stop()
+        if journal is not None:
+            journal.stop()
@@ -1,41 +1,77 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Any, Callable
 from dotenv import load_dotenv
 
+from .wire import WIRE_FORMATS
+
 
 load_dotenv()
 
 
+def _truthy(v: str) -> bool:
+    return v.lower() in ("1", "true", "yes", "y")
+
+
+def _env(key: str, default: str, cast: Callable[[str], Any] = str) -> Any:
+    # Read the environment when Settings() is instantiated, not when the class is defined
+    return field(default_factory=lambda: cast(os.getenv(key, default)))
+
+
 @dataclass
-class Settings:
+class Settings:
     # Ollama
-    ollama_base_url: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-    ollama_model: str = os.getenv("OLLAMA_MODEL", "exaone3.5:7.8b")
-    temperature: float = float(os.getenv("LLM_TEMPERATURE", "0.1"))
-    num_ctx: int = int(os.getenv("LLM_CONTEXT_TOKENS", "4096"))
+    ollama_base_url: str = _env("OLLAMA_BASE_URL", "http://localhost:11434")
+    ollama_model: str = _env("OLLAMA_MODEL", "exaone3.5:7.8b")
+    temperature: float = _env("LLM_TEMPERATURE", "0.1", float)
+    num_ctx: int = _env("LLM_CONTEXT_TOKENS", "4096", int)
 
     # 도구 호출(함수 호출) 사용 여부
     # JSON 기반 명령 파싱으로 전환하므로 기본값을 false로 변경
     # 필요 시 환경변수 USE_TOOLS=true 로 켤 수 있음
-    use_tools: bool = os.getenv("USE_TOOLS", "false").lower() in ("1", "true", "yes", "y")
-
-    # Robot socket
-    robot_host: str = os.getenv("ROBOT_HOST", "192.168.0.5")
-    robot_port: int = int(os.getenv("ROBOT_PORT", "5000"))
-    robot_transport: str = os.getenv("ROBOT_TRANSPORT", "tcp")  # tcp or udp
-
-    # Robot event listener (server -> receives robot's async results)
-    event_listen_host: str = os.getenv("EVENT_LISTEN_HOST", "0.0.0.0")
-    event_listen_port: int = int(os.getenv("EVENT_LISTEN_PORT", "6000"))
-    event_transport: str = os.getenv("EVENT_TRANSPORT", "udp")  # tcp or udp
+    use_tools: bool = _env("USE_TOOLS", "false", _truthy)
+
+    # LLM 그래프(langchain/langgraph 임포트 + 컴파일)는 지연 생성한다.
+    # true: 서버 기동 직후 백그라운드에서 미리 생성, false: 첫 /chat 요청 시 생성
+    llm_eager_init: bool = _env("LLM_EAGER_INIT", "true", _truthy)
+
+    # Robot socket
+    robot_host: str = _env("ROBOT_HOST", "192.168.0.5")
+    robot_port: int = _env("ROBOT_PORT", "5000", int)
+    robot_transport: str = _env("ROBOT_TRANSPORT", "tcp")  # tcp or udp
+    # Command encoding: json (default) or binary (app/wire.py). The event
+    # listener accepts both formats regardless of this setting.
+    robot_wire_format: str = _env("ROBOT_WIRE_FORMAT", "json", str.lower)
+
+    # Duplicate suppression: identical robot commands within the debounce window
+    # are sent once; /chat requests repeating an idempotency key within the TTL
+    # get the original reply without re-running the model.
+    dispatch_debounce_ms: float = _env("DISPATCH_DEBOUNCE_MS", "1000", float)
+    idempotency_ttl_s: float = _env("IDEMPOTENCY_TTL_S", "60", float)
+
+    # Robot event listener (server -> receives robot's async results)
+    event_listen_host: str = _env("EVENT_LISTEN_HOST", "0.0.0.0")
+    event_listen_port: int = _env("EVENT_LISTEN_PORT", "6000", int)
+    event_transport: str = _env("EVENT_TRANSPORT", "udp")  # tcp or udp
+
+    # Event journal (disabled when EVENT_JOURNAL_DIR is empty)
+    event_journal_dir: str = _env("EVENT_JOURNAL_DIR", "")
+    event_journal_segment_mb: int = _env("EVENT_JOURNAL_SEGMENT_MB", "64", int)
+    event_journal_commit_ms: float = _env("EVENT_JOURNAL_COMMIT_MS", "5", float)
+
+    # Multi-worker mode (WEB_WORKERS > 1): chat history goes to SQLite and robot
+    # events are fanned out to workers by one ingest process over a Unix socket.
+    web_workers: int = _env("WEB_WORKERS", "1", int)
+    session_db: str = _env("SESSION_DB", "")  # empty = in-process memory
+    event_broker_socket: str = _env("EVENT_BROKER_SOCKET", "")  # set by main.run() for workers
 
     # 소켓으로 전송할 액션 이름 (UTF-8 정리)
-    action_name_follow: str = os.getenv("ACTION_NAME_FOLLOW", "follow")
-    action_name_block: str = os.getenv("ACTION_NAME_BLOCK", "block")
-    action_name_research: str = os.getenv("ACTION_NAME_RESEARCH", "research")
+    action_name_follow: str = _env("ACTION_NAME_FOLLOW", "follow")
+    action_name_block: str = _env("ACTION_NAME_BLOCK", "block")
+    action_name_research: str = _env("ACTION_NAME_RESEARCH", "research")
 
     # System prompt: JSON 기반 명령 지시
-    system_prompt: str = os.getenv(
+    system_prompt: str = _env(
         "SYSTEM_PROMPT",
         (
             "너는 유닛리 Go2 로봇 제어 보조자다. 사용자의 요청을 분석해 다음 JSON만 출력하라."
@@ -50,3 +86,10 @@ class Settings:
             "4) 반드시 JSON만 출력 (예시) {\"cmd\":\"follow\",\"say\":\"알겠습니다. 따라가겠습니다.\"}\n"
         ),
     )
+
+    def __post_init__(self) -> None:
+        # Fail at startup instead of silently sending JSON for a typo like "msgpack"
+        if self.robot_wire_format not in WIRE_FORMATS:
+            raise ValueError(
+                f"ROBOT_WIRE_FORMAT must be one of {', '.join(WIRE_FORMATS)}, got {self.robot_wire_format!r}"
+            )
@@ -0,0 +1,253 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Union
+
+
+class _Entry:
+    __slots__ = ("expires", "done", "result", "error")
+
+    def __init__(self, expires: float) -> None:
+        self.expires = expires
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class DedupTable:
+    """Run each key at most once per ``window`` seconds and replay its result to duplicates.
+
+    A duplicate that arrives while the first call is still running waits for
+    it instead of running concurrently. Failed calls are not cached, so the
+    next attempt after the failure runs again.
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.suppressed = 0
+        self._last_cmd: Optional[str] = None
+        self._generation = 0
+
+    def generation(self, cmd: str) -> int:
+        """Counter that bumps whenever ``cmd`` differs from the previous command.
+
+        Used in derived keys so a repeat collapses but follow -> block -> follow
+        is three distinct commands.
+        """
+        with self._lock:
+            if cmd != self._last_cmd:
+                self._last_cmd = cmd
+                self._generation += 1
+            return self._generation
+
+    def run(self, key: str, fn: Callable[[], Any]) -> Any:
+        if self.window <= 0:
+            with self._lock:
+                self.executed += 1
+            return fn()
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.suppressed += 1
+                owner = False
+            else:
+                entry = _Entry(now + self.window)  # reset once the call finishes
+                self._entries[key] = entry
+                self.executed += 1
+                owner = True
+
+        if not owner:
+            entry.done.wait()
+            if entry.error is not None:
+                raise entry.error
+            return entry.result
+
+        try:
+            entry.result = fn()
+            return entry.result
+        except BaseException as e:
+            entry.error = e
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            raise
+        finally:
+            # The window starts when the result is known, so a slow call is not
+            # already expired by the time a client retries after its reply
+            entry.expires = time.monotonic() + self.window
+            entry.done.set()
+
+    def _purge(self, now: float) -> None:
+        # Only finished entries expire; an in-flight call keeps its key reserved
+        expired = [k for k, e in self._entries.items() if e.expires <= now and e.done.is_set()]
+        for k in expired:
+            del self._entries[k]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "window_s": self.window,
+                "executed": self.executed,
+                "suppressed": self.suppressed,
+                "entries": len(self._entries),
+            }
+
+
+# In-flight rows older than this are treated as abandoned (worker crashed mid-call)
+_LEASE_S = 300.0
+
+
+class SqliteDedupTable:
+    """DedupTable shared by all uvicorn workers through the SESSION_DB SQLite file.
+
+    Same contract as DedupTable: the first caller of a key claims it with
+    INSERT OR IGNORE inside BEGIN IMMEDIATE and runs ``fn``; duplicates from
+    any worker poll the row and get the stored result. Results must be JSON
+    serializable. Counters live in the database so /metrics is not a
+    per-worker fragment.
+    """
+
+    def __init__(self, path: str, window: float, scope: str, poll: float = 0.05) -> None:
+        self.path = path
+        self.window = window
+        self.scope = scope
+        self.poll = poll
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS dedup ("
+            " scope TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " done INTEGER NOT NULL DEFAULT 0,"
+            " result TEXT,"
+            " PRIMARY KEY (scope, key))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS dedup_stats ("
+            " scope TEXT PRIMARY KEY,"
+            " executed INTEGER NOT NULL DEFAULT 0,"
+            " suppressed INTEGER NOT NULL DEFAULT 0,"
+            " last_cmd TEXT,"
+            " generation INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.execute("INSERT OR IGNORE INTO dedup_stats (scope) VALUES (?)", (scope,))
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads (FastAPI threadpool)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _tx(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            out = fn(conn)
+            conn.execute("COMMIT")
+            return out
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def generation(self, cmd: str) -> int:
+        def _bump(conn: sqlite3.Connection) -> int:
+            last, gen = conn.execute(
+                "SELECT last_cmd, generation FROM dedup_stats WHERE scope = ?", (self.scope,)
+            ).fetchone()
+            if cmd != last:
+                gen += 1
+                conn.execute(
+                    "UPDATE dedup_stats SET last_cmd = ?, generation = ? WHERE scope = ?", (cmd, gen, self.scope)
+                )
+            return gen
+
+        return self._tx(_bump)
+
+    def run(self, key: str, fn: Callable[[], Any]) -> Any:
+        if self.window <= 0:
+            self._tx(lambda c: c.execute(
+                "UPDATE dedup_stats SET executed = executed + 1 WHERE scope = ?", (self.scope,)
+            ))
+            return fn()
+
+        while True:
+            if self._tx(lambda c: self._claim(c, key)):
+                break
+            found, result = self._wait(key)
+            if found:
+                return result
+            # The owner failed (row deleted) or its lease ran out: try to claim again
+
+        try:
+            result = fn()
+        except BaseException:
+            self._tx(lambda c: c.execute("DELETE FROM dedup WHERE scope = ? AND key = ?", (self.scope, key)))
+            raise
+        # The window starts when the result is known (see DedupTable.run)
+        self._tx(lambda c: c.execute(
+            "UPDATE dedup SET done = 1, result = ?, expires_at = ? WHERE scope = ? AND key = ?",
+            (json.dumps(result, ensure_ascii=False), time.time() + self.window, self.scope, key),
+        ))
+        return result
+
+    def _claim(self, conn: sqlite3.Connection, key: str) -> bool:
+        now = time.time()
+        conn.execute("DELETE FROM dedup WHERE scope = ? AND expires_at <= ?", (self.scope, now))
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO dedup (scope, key, expires_at) VALUES (?, ?, ?)",
+            (self.scope, key, now + self.window + _LEASE_S),
+        )
+        owner = cur.rowcount == 1
+        conn.execute(
+            f"UPDATE dedup_stats SET {'executed' if owner else 'suppressed'} = "
+            f"{'executed' if owner else 'suppressed'} + 1 WHERE scope = ?",
+            (self.scope,),
+        )
+        return owner
+
+    def _wait(self, key: str) -> tuple[bool, Any]:
+        # Duplicate: wait for the owner's result, which may be in another process
+        conn = self._conn()
+        while True:
+            row = conn.execute(
+                "SELECT done, result, expires_at FROM dedup WHERE scope = ? AND key = ?", (self.scope, key)
+            ).fetchone()
+            if row is None or row[2] <= time.time():
+                return False, None
+            if row[0]:
+                return True, json.loads(row[1])
+            time.sleep(self.poll)
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._conn()
+        executed, suppressed = conn.execute(
+            "SELECT executed, suppressed FROM dedup_stats WHERE scope = ?", (self.scope,)
+        ).fetchone()
+        (entries,) = conn.execute(
+            "SELECT COUNT(*) FROM dedup WHERE scope = ? AND expires_at > ?", (self.scope, time.time())
+        ).fetchone()
+        return {
+            "window_s": self.window,
+            "executed": executed,
+            "suppressed": suppressed,
+            "entries": entries,
+            "shared": True,
+        }
+
+
+def dedup_table(window: float, scope: str, db: str = "") -> Union[DedupTable, SqliteDedupTable]:
+    """Process-local table, or one shared across workers when ``db`` (SESSION_DB) is set."""
+    if db:
+        return SqliteDedupTable(db, window, scope)
+    return DedupTable(window)
@@ -1,12 +1,17 @@
 import asyncio
-from typing import Any, List
+from typing import TYPE_CHECKING, Any, List, Optional
+
+if TYPE_CHECKING:
+    from .journal import EventJournal
 
 
 class EventBus:
     """Simple in-memory pub/sub using asyncio.Queue for SSE/web subscribers."""
 
-    def __init__(self) -> None:
+    def __init__(self, journal: Optional["EventJournal"] = None) -> None:
         self._subs: List[asyncio.Queue] = []
+        # Optional durable log of everything published (see app/journal.py)
+        self.journal = journal
 
     def subscribe(self) -> asyncio.Queue:
         q: asyncio.Queue = asyncio.Queue()
@@ -19,7 +24,12 @@ class EventBus:
         except ValueError:
             pass
 
-    def publish(self, data: Any) -> None:
+    def publish(self, data: Any, record: bool = True) -> None:
+        if record and self.journal is not None:
+            try:
+                self.journal.append(data)
+            except Exception as e:
+                print(f"[JOURNAL][append][err] {e}")
         # Non-blocking fan-out; drop if subscriber queue is full (unlikely with default size)
         for q in list(self._subs):
             try:
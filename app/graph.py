@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Dict, List, Sequence, TypedDict
+from typing import List, Sequence, TypedDict
 from typing_extensions import Annotated
 
 import json
@@ -12,6 +12,7 @@ from langgraph.prebuilt import ToolNode
 
 from .config import Settings
 from .robot import RobotClient
+from .sessions import MemorySessionStore, SqliteSessionStore
 from .tools import build_tools
 
 
@@ -30,13 +31,19 @@ def _route_after_model(state: MessagesState):
 class GraphManager:
     def __init__(self, settings: Settings):
         self.settings = settings
-        self.sessions: Dict[str, MessagesState] = {}
+        # Chat history; SQLite when shared across uvicorn workers (SESSION_DB)
+        self.sessions = (
+            SqliteSessionStore(settings.session_db) if settings.session_db else MemorySessionStore()
+        )
 
         # Robot client
         self.robot = RobotClient(
             host=settings.robot_host,
             port=settings.robot_port,
             transport=settings.robot_transport,
+            wire_format=settings.robot_wire_format,
+            debounce=settings.dispatch_debounce_ms / 1000.0,
+            dedup_db=settings.session_db,
         )
 
         # Tools
@@ -73,10 +80,10 @@ class GraphManager:
         builder.set_entry_point("model")
         self.graph = builder.compile()
 
-    def _ensure_session(self, session_id: str) -> MessagesState:
-        if session_id not in self.sessions:
-            self.sessions[session_id] = {"messages": [SystemMessage(content=self.settings.system_prompt)]}
-        return self.sessions[session_id]
+    def _ensure_session(self, session_id: str) -> List[AnyMessage]:
+        # The store seeds the system prompt atomically, so concurrent first
+        # turns (threads or workers) never store it twice
+        return self.sessions.load_or_create(session_id, SystemMessage(content=self.settings.system_prompt))
 
     def _call_model(self, state: MessagesState) -> MessagesState:
         # Chat models expect a list of BaseMessage (chat history), not the
@@ -105,18 +112,17 @@ class GraphManager:
         return {"messages": [res]}
 
     def chat(self, session_id: str, user_text: str) -> str:
-        session = self._ensure_session(session_id)
-        session["messages"].append(HumanMessage(content=user_text))
+        user_msg = HumanMessage(content=user_text)
+        messages = self._ensure_session(session_id) + [user_msg]
 
-        result: MessagesState = self.graph.invoke({"messages": session["messages"]})
-        # Graph returns the full updated state; extend session
-        # Only append new messages beyond what we had
-        new_msgs = result["messages"][len(session["messages"]):]
-        session["messages"].extend(new_msgs)
+        result: MessagesState = self.graph.invoke({"messages": messages})
+        # Graph returns the full updated state; persist only the new turn
+        new_msgs = result["messages"][len(messages):]
+        self.sessions.append(session_id, [user_msg] + new_msgs)
 
         # Find the latest AI message content to return
         last_ai = None
-        for m in reversed(session["messages"]):
+        for m in reversed(messages + new_msgs):
             if isinstance(m, AIMessage):
                 last_ai = m
                 break
@@ -187,22 +193,25 @@ class GraphManager:
             print(f"[CMD][parse][error] {e}")
             return None
 
+    def _dispatch(self, label: str, action: str) -> None:
+        if self.robot.send(action):
+            print(f"[CMD] execute: {label}")
+        else:
+            print(f"[CMD] suppressed duplicate: {label} (within {self.robot.debounce:g}s)")
+
     def _handle_command(self, cmd: str | None) -> str | None:
         if not cmd:
             return None
         norm = cmd.strip().lower()
         try:
             if norm in ("follow", "따라", "따라가", "따라가라", "따라와"):
-                print("[CMD] execute: follow")
-                self.robot.send(self.settings.action_name_follow)
+                self._dispatch("follow", self.settings.action_name_follow)
                 return "따라가겠습니다."
             if norm in ("block", "막", "막아", "길을 막아", "길을 막아라"):
-                print("[CMD] execute: block")
-                self.robot.send(self.settings.action_name_block)
+                self._dispatch("block", self.settings.action_name_block)
                 return "앞을 가로막겠습니다."
             if norm in ("research", "탐색", "탐색해", "수색", "수색해", "scan", "explore"):
-                print("[CMD] execute: research")
-                self.robot.send(self.settings.action_name_research)
+                self._dispatch("research", self.settings.action_name_research)
                 return "주변을 탐색하겠습니다."
             if norm == "none":
                 print("[CMD] no-op")
@@ -0,0 +1,404 @@
+import asyncio
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from .events import EventBus
+
+if TYPE_CHECKING:
+    from .config import Settings
+
+
+# Segment layout
+#   <first_id>.log : [record header][payload] ...   header = len(u32) id(u64) ts(f64)
+#   <first_id>.idx : fixed-size entries              entry  = id(u64) ts(f64) offset(u64) len(u32)
+# Payload is the event serialized as UTF-8 JSON. The index lets readers binary
+# search by id or timestamp through mmap without touching the payload bytes.
+_REC_HDR = struct.Struct("<IQd")
+_IDX_ENT = struct.Struct("<QdQI")
+
+
+@dataclass
+class JournalRecord:
+    event_id: int
+    ts: float
+    data: Dict[str, Any]
+
+
+def _segment_ids(directory: str) -> List[int]:
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    ids = []
+    for name in names:
+        stem, ext = os.path.splitext(name)
+        if ext == ".log" and stem.isdigit():
+            ids.append(int(stem))
+    return sorted(ids)
+
+
+def _segment_path(directory: str, first_id: int, ext: str) -> str:
+    return os.path.join(directory, f"{first_id:020d}{ext}")
+
+
+@dataclass
+class EventJournal:
+    """Append-only, segmented event log with group commit.
+
+    ``append`` only enqueues; a background writer batches pending events,
+    writes them and issues a single fsync per batch.
+    """
+
+    directory: str
+    segment_bytes: int = 64 * 1024 * 1024
+    commit_interval: float = 0.005  # seconds to wait for more events before a commit
+    fsync: bool = True
+
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+    _cond: threading.Condition = field(init=False)
+    _pending: List[Tuple[int, float, bytes]] = field(default_factory=list, init=False)
+    _next_id: int = field(default=1, init=False)
+    _last_ts: float = field(default=0.0, init=False)
+    _committed_id: int = field(default=0, init=False)
+    _t: Optional[threading.Thread] = field(default=None, init=False)
+    _stop: threading.Event = field(default_factory=threading.Event, init=False)
+
+    # Writer-thread state
+    _log_f: Any = field(default=None, init=False)
+    _idx_f: Any = field(default=None, init=False)
+    _log_size: int = field(default=0, init=False)
+    _resync: bool = field(default=False, init=False)
+
+    def __post_init__(self) -> None:
+        self._cond = threading.Condition(self._lock)
+
+    def start(self) -> None:
+        if self._t and self._t.is_alive():
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._recover()
+        self._stop.clear()
+        self._t = threading.Thread(target=self._run, daemon=True)
+        self._t.start()
+        print(f"[JOURNAL] start {self.directory} next_id={self._next_id}")
+
+    def stop(self) -> None:
+        if not self._t:
+            return
+        with self._cond:
+            self._stop.set()
+            self._cond.notify_all()
+        self._t.join(timeout=5.0)
+        self._t = None
+        self._close_segment()
+        print("[JOURNAL] stopped")
+
+    def append(self, data: Any) -> int:
+        """Queue an event for the next group commit and return its event id."""
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        with self._cond:
+            event_id = self._next_id
+            self._next_id += 1
+            # Keep timestamps non-decreasing so readers can binary search on them
+            ts = max(time.time(), self._last_ts)
+            self._last_ts = ts
+            self._pending.append((event_id, ts, payload))
+            self._cond.notify_all()
+        return event_id
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every event appended so far is durable."""
+        with self._cond:
+            target = self._next_id - 1
+            return self._cond.wait_for(lambda: self._committed_id >= target, timeout=timeout)
+
+    # --- writer thread ---
+    def _run(self) -> None:
+        retry_delay = 0.0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._stop.is_set())
+                if not self._pending and self._stop.is_set():
+                    return
+            if retry_delay > 0:
+                time.sleep(retry_delay)
+            elif self.commit_interval > 0 and not self._stop.is_set():
+                # Give concurrent producers a moment to join this batch
+                time.sleep(self.commit_interval)
+            with self._cond:
+                batch, self._pending = self._pending, []
+
+            durable: Optional[int] = None
+            try:
+                if self._resync:
+                    # A previous batch failed: resync with what is really on disk
+                    durable = self._reopen_tail()
+                    self._resync = False
+                    batch = [r for r in batch if r[0] > durable]
+                if batch:
+                    self._write_batch(batch)
+                    durable = batch[-1][0]
+                retry_delay = 0.0
+            except Exception as e:
+                print(f"[JOURNAL][err] {e}")
+                self._resync = True
+                try:
+                    durable = self._reopen_tail()
+                    self._resync = False
+                except Exception as e2:
+                    print(f"[JOURNAL][recover][err] {e2}")
+                # Re-queue whatever did not reach the disk, ahead of newer events.
+                # Ids must stay contiguous, so nothing is skipped.
+                retry = [r for r in batch if durable is None or r[0] > durable]
+                if retry and self._stop.is_set():
+                    print(f"[JOURNAL][err] dropping {len(retry)} unwritten events on stop")
+                    retry = []
+                with self._cond:
+                    self._pending = retry + self._pending
+                retry_delay = min(max(retry_delay * 2, 0.1), 2.0)
+
+            if durable is not None:
+                with self._cond:
+                    self._committed_id = max(self._committed_id, durable)
+                    self._cond.notify_all()
+
+    def _write_batch(self, batch: List[Tuple[int, float, bytes]]) -> None:
+        log_buf = bytearray()
+        idx_buf = bytearray()
+        for event_id, ts, payload in batch:
+            if self._log_f is None or self._log_size + len(log_buf) >= self.segment_bytes:
+                self._commit(log_buf, idx_buf)
+                log_buf, idx_buf = bytearray(), bytearray()
+                self._open_segment(event_id)
+            offset = self._log_size + len(log_buf)
+            log_buf += _REC_HDR.pack(len(payload), event_id, ts)
+            log_buf += payload
+            idx_buf += _IDX_ENT.pack(event_id, ts, offset + _REC_HDR.size, len(payload))
+        self._commit(log_buf, idx_buf)
+
+    def _commit(self, log_buf: bytes, idx_buf: bytes) -> None:
+        if not log_buf or self._log_f is None:
+            return
+        # Log before index: an index entry never points at unwritten bytes
+        self._log_f.write(log_buf)
+        self._log_f.flush()
+        if self.fsync:
+            os.fsync(self._log_f.fileno())
+        self._idx_f.write(idx_buf)
+        self._idx_f.flush()
+        if self.fsync:
+            os.fsync(self._idx_f.fileno())
+        self._log_size += len(log_buf)
+
+    def _open_segment(self, first_id: int) -> None:
+        self._close_segment()
+        self._log_f = open(_segment_path(self.directory, first_id, ".log"), "ab")
+        self._idx_f = open(_segment_path(self.directory, first_id, ".idx"), "ab")
+        self._log_size = self._log_f.tell()
+
+    def _close_segment(self) -> None:
+        for f in (self._log_f, self._idx_f):
+            if f is not None:
+                try:
+                    f.close()
+                except Exception:
+                    pass
+        self._log_f = None
+        self._idx_f = None
+
+    def _recover(self) -> None:
+        tail = self._recover_tail()
+        if tail is None:
+            return
+        last_id, last_ts = tail
+        self._next_id = last_id + 1
+        self._committed_id = last_id
+        self._last_ts = last_ts
+
+    def _reopen_tail(self) -> int:
+        """Resync the writer with the disk after a failed batch; returns the last durable id."""
+        self._close_segment()
+        tail = self._recover_tail()
+        return tail[0] if tail is not None else 0
+
+    def _recover_tail(self) -> Optional[Tuple[int, float]]:
+        """Reopen the last segment, dropping torn writes and re-indexing records missing from the index."""
+        seg_ids = _segment_ids(self.directory)
+        if not seg_ids:
+            return None
+        first_id = seg_ids[-1]
+        log_path = _segment_path(self.directory, first_id, ".log")
+        idx_path = _segment_path(self.directory, first_id, ".idx")
+
+        idx_size = os.path.getsize(idx_path) if os.path.exists(idx_path) else 0
+        idx_size -= idx_size % _IDX_ENT.size
+        last_id, last_ts, end = first_id - 1, 0.0, 0
+        with open(idx_path, "a+b") as f:
+            f.truncate(idx_size)
+            if idx_size:
+                f.seek(idx_size - _IDX_ENT.size)
+                last_id, last_ts, offset, length = _IDX_ENT.unpack(f.read(_IDX_ENT.size))
+                end = offset + length
+
+        # Records written to the log but not yet indexed when we went down
+        missing = bytearray()
+        with open(log_path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            pos = end
+            while pos + _REC_HDR.size <= size:
+                f.seek(pos)
+                length, event_id, ts = _REC_HDR.unpack(f.read(_REC_HDR.size))
+                if event_id != last_id + 1 or pos + _REC_HDR.size + length > size:
+                    break
+                missing += _IDX_ENT.pack(event_id, ts, pos + _REC_HDR.size, length)
+                last_id, last_ts = event_id, ts
+                pos += _REC_HDR.size + length
+            f.truncate(pos)
+        if missing:
+            with open(idx_path, "ab") as f:
+                f.write(missing)
+
+        self._open_segment(first_id)
+        return last_id, last_ts
+
+
+def journal_from_settings(settings: "Settings") -> Optional[EventJournal]:
+    if not settings.event_journal_dir:
+        return None
+    return EventJournal(
+        directory=settings.event_journal_dir,
+        segment_bytes=settings.event_journal_segment_mb * 1024 * 1024,
+        commit_interval=settings.event_journal_commit_ms / 1000.0,
+    )
+
+
+class _Segment:
+    """Read-only mmap view of one segment, snapshotted at open."""
+
+    def __init__(self, directory: str, first_id: int) -> None:
+        self.first_id = first_id
+        self._log_f = open(_segment_path(directory, first_id, ".log"), "rb")
+        self._idx_f = open(_segment_path(directory, first_id, ".idx"), "rb")
+        idx_size = os.fstat(self._idx_f.fileno()).st_size
+        self.count = idx_size // _IDX_ENT.size
+        log_size = os.fstat(self._log_f.fileno()).st_size
+        self._idx = mmap.mmap(self._idx_f.fileno(), 0, access=mmap.ACCESS_READ) if self.count else None
+        self._log = mmap.mmap(self._log_f.fileno(), 0, access=mmap.ACCESS_READ) if log_size else None
+        # Drop index entries that point beyond the log snapshot
+        while self.count and self._end_of(self.count - 1) > log_size:
+            self.count -= 1
+
+    def _end_of(self, i: int) -> int:
+        _, _, offset, length = self.entry(i)
+        return offset + length
+
+    def entry(self, i: int) -> Tuple[int, float, int, int]:
+        return _IDX_ENT.unpack_from(self._idx, i * _IDX_ENT.size)
+
+    def id_at(self, i: int) -> int:
+        return self.entry(i)[0]
+
+    def ts_at(self, i: int) -> float:
+        return self.entry(i)[1]
+
+    def read(self, i: int) -> JournalRecord:
+        event_id, ts, offset, length = self.entry(i)
+        return JournalRecord(event_id, ts, json.loads(self._log[offset:offset + length].decode("utf-8")))
+
+    def close(self) -> None:
+        for m in (self._idx, self._log):
+            if m is not None:
+                m.close()
+        self._idx_f.close()
+        self._log_f.close()
+
+
+class _Keys:
+    # Sequence adapter so bisect can search an mmap'd index without copying it
+    def __init__(self, seg: _Segment, key) -> None:
+        self._seg = seg
+        self._key = key
+
+    def __len__(self) -> int:
+        return self._seg.count
+
+    def __getitem__(self, i: int):
+        return self._key(i)
+
+
+class JournalReader:
+    """Scan a journal directory by event id or time range via mmap."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._segments: List[_Segment] = []
+        for first_id in _segment_ids(directory):
+            if os.path.exists(_segment_path(directory, first_id, ".idx")):
+                self._segments.append(_Segment(directory, first_id))
+
+    def __enter__(self) -> "JournalReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for seg in self._segments:
+            seg.close()
+        self._segments = []
+
+    def scan_ids(self, start_id: int = 0, end_id: Optional[int] = None) -> Iterator[JournalRecord]:
+        """Yield records with ``start_id <= event_id <= end_id``."""
+        first_ids = [seg.first_id for seg in self._segments]
+        k = max(bisect.bisect_right(first_ids, start_id) - 1, 0)
+        for seg in self._segments[k:]:
+            if end_id is not None and seg.first_id > end_id:
+                return
+            i = bisect.bisect_left(_Keys(seg, seg.id_at), start_id)
+            while i < seg.count:
+                if end_id is not None and seg.id_at(i) > end_id:
+                    return
+                yield seg.read(i)
+                i += 1
+
+    def scan_time(self, since: Optional[float] = None, until: Optional[float] = None) -> Iterator[JournalRecord]:
+        """Yield records with ``since <= ts < until`` (epoch seconds)."""
+        for seg in self._segments:
+            if not seg.count:
+                continue
+            if since is not None and seg.ts_at(seg.count - 1) < since:
+                continue
+            i = bisect.bisect_left(_Keys(seg, seg.ts_at), since) if since is not None else 0
+            while i < seg.count:
+                if until is not None and seg.ts_at(i) >= until:
+                    return
+                yield seg.read(i)
+                i += 1
+
+
+async def replay(records: Iterator[JournalRecord], bus: EventBus, speed: float = 1.0) -> int:
+    """Publish journaled events into ``bus`` preserving their original spacing.
+
+    ``speed`` scales playback (2.0 = twice as fast); ``0`` publishes back-to-back.
+    Replayed events are not written back to the bus's journal.
+    """
+    count = 0
+    first_ts: Optional[float] = None
+    started = time.monotonic()
+    for rec in records:
+        if first_ts is None:
+            first_ts = rec.ts
+        if speed > 0:
+            delay = (rec.ts - first_ts) / speed - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        bus.publish(rec.data, record=False)
+        count += 1
+    return count
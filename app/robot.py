@@ -1,6 +1,9 @@
-import json
 import socket
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+from .dedup import DedupTable, SqliteDedupTable, dedup_table
+from .wire import WIRE_FORMATS, WIRE_JSON, encode_command
 
 
 @dataclass
@@ -8,11 +11,42 @@ class RobotClient:
     host: str
     port: int
     transport: str = "udp"  # "tcp" or "udp"
+    wire_format: str = WIRE_JSON  # "json" or "binary" (see app/wire.py)
+    # Identical commands within this many seconds are sent once (0 = off)
+    debounce: float = 0.0
+    # SQLite file shared by all workers (SESSION_DB); empty = per-process table
+    dedup_db: str = ""
+
+    dedup: Union[DedupTable, SqliteDedupTable] = field(init=False)
+
+    def __post_init__(self) -> None:
+        if self.wire_format not in WIRE_FORMATS:
+            raise ValueError(f"unknown wire format: {self.wire_format!r}")
+        self.dedup = dedup_table(self.debounce, "robot", self.dedup_db)
+
+    def send(self, name: str, value: int = 1, key: Optional[str] = None) -> bool:
+        """Send a command unless it duplicates ``key`` within the debounce window.
+
+        ``key`` defaults to the command plus a generation counter that bumps
+        whenever a different command is requested, so follow -> block -> follow
+        sends all three while repeated follows collapse. Returns False when the
+        command was suppressed as a duplicate.
+        """
+        cmd = f"{name}:{value}"
+        key = key or f"{cmd}#{self.dedup.generation(cmd)}"
+        sent = []
+
+        def _dispatch() -> None:
+            self._send(name, value)
+            sent.append(True)
+
+        self.dedup.run(key, _dispatch)
+        return bool(sent)
 
-    def send(self, name: str, value: int = 1) -> None:
+    def _send(self, name: str, value: int) -> None:
         payload_dict = {"name": name, "value": value}
-        payload = json.dumps(payload_dict, ensure_ascii=False).encode("utf-8")
-        print(f"[ROBOT][send] {self.transport.upper()} {self.host}:{self.port} -> {payload_dict}")
+        payload = encode_command(name, value, self.wire_format)
+        print(f"[ROBOT][send] {self.transport.upper()} {self.host}:{self.port} -> {payload_dict} [{self.wire_format} {len(payload)}B]")
         if self.transport.lower() == "udp":
             self._send_udp(payload)
         else:
@@ -1,10 +1,10 @@
-import json
 import socket
 import threading
 from dataclasses import dataclass, field
 from typing import Optional
 
 from .events import EventBus
+from .wire import decode, is_binary, next_frame
 
 
 @dataclass
@@ -49,14 +49,13 @@ class RobotEventServer:
                 except Exception as e:
                     print(f"[ROBOT][srv][udp][err] {e}")
                     continue
+                obj = self._parse(data, f"udp://{addr[0]}:{addr[1]}")
+                # One bad event must not take the listener thread down
                 try:
-                    text = data.decode("utf-8", errors="replace").strip()
-                    obj = json.loads(text)
-                except Exception:
-                    obj = {"kind": "robot_event", "text": text}
-                obj.setdefault("kind", "robot_event")
-                obj.setdefault("source", f"udp://{addr[0]}:{addr[1]}")
-                self.bus.publish(obj)
+                    self.bus.publish(obj)
+                except Exception as e:
+                    print(f"[ROBOT][srv][udp][publish][err] {e}")
+                    continue
                 print(f"[ROBOT][srv][udp] from {addr}: {obj}")
         finally:
             s.close()
@@ -91,10 +90,12 @@ class RobotEventServer:
                         if not chunk:
                             break
                         buf += chunk
-                        # Try to split by newlines (JSON lines)
-                        while b"\n" in buf:
-                            line, buf = buf.split(b"\n", 1)
-                            self._publish_tcp_line(line, addr)
+                        # JSON lines or length-prefixed binary frames, mixed per message
+                        while True:
+                            frame, buf = next_frame(buf)
+                            if frame is None:
+                                break
+                            self._publish_tcp_line(frame, addr)
                     except socket.timeout:
                         # publish any remaining buffer as a single message
                         if buf:
@@ -108,15 +109,25 @@ class RobotEventServer:
                 print(f"[ROBOT][srv][tcp][conn][err] {e}")
 
     def _publish_tcp_line(self, data: bytes, addr) -> None:
-        text = data.decode("utf-8", errors="replace").strip()
-        if not text:
+        if not is_binary(data) and not data.strip():
             return
+        obj = self._parse(data, f"tcp://{addr[0]}:{addr[1]}")
         try:
-            obj = json.loads(text)
-        except Exception:
-            obj = {"kind": "robot_event", "text": text}
-        obj.setdefault("kind", "robot_event")
-        obj.setdefault("source", f"tcp://{addr[0]}:{addr[1]}")
-        self.bus.publish(obj)
+            self.bus.publish(obj)
+        except Exception as e:
+            print(f"[ROBOT][srv][tcp][publish][err] {e}")
+            return
         print(f"[ROBOT][srv][tcp] from {addr}: {obj}")
 
+    @staticmethod
+    def _parse(data: bytes, source: str) -> dict:
+        # Auto-detect binary frame vs JSON text per packet; anything else is raw text
+        try:
+            obj = decode(data)
+        except Exception:
+            obj = None
+        if not isinstance(obj, dict):
+            obj = {"kind": "robot_event", "text": data.decode("utf-8", errors="replace").strip()}
+        obj.setdefault("kind", "robot_event")
+        obj.setdefault("source", source)
+        return obj
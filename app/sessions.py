@@ -0,0 +1,105 @@
+import json
+import sqlite3
+import threading
+from typing import Dict, List
+
+from langchain_core.messages import AnyMessage, messages_from_dict, messages_to_dict
+
+
+class MemorySessionStore:
+    """Per-process chat history (single worker)."""
+
+    def __init__(self) -> None:
+        self._sessions: Dict[str, List[AnyMessage]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> List[AnyMessage]:
+        with self._lock:
+            return list(self._sessions.get(session_id, []))
+
+    def load_or_create(self, session_id: str, header: AnyMessage) -> List[AnyMessage]:
+        with self._lock:
+            return list(self._sessions.setdefault(session_id, [header]))
+
+    def append(self, session_id: str, messages: List[AnyMessage]) -> None:
+        with self._lock:
+            self._sessions.setdefault(session_id, []).extend(messages)
+
+
+class SqliteSessionStore:
+    """Chat history shared by all uvicorn workers through one SQLite file in WAL mode.
+
+    Messages are append-only rows, so concurrent turns from different
+    workers only contend for the short insert transaction.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " session_id TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " data TEXT NOT NULL,"
+            " PRIMARY KEY (session_id, seq))"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads (FastAPI threadpool)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id: str) -> List[AnyMessage]:
+        rows = self._conn().execute(
+            "SELECT data FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+        ).fetchall()
+        return messages_from_dict([json.loads(r[0]) for r in rows])
+
+    def load_or_create(self, session_id: str, header: AnyMessage) -> List[AnyMessage]:
+        history = self.load(session_id)
+        if history:
+            return history
+        # Seq 0 is the session header; INSERT OR IGNORE inside one write
+        # transaction makes concurrent first turns store it exactly once
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR IGNORE INTO messages (session_id, seq, data) VALUES (?, 0, ?)",
+                (session_id, json.dumps(messages_to_dict([header])[0], ensure_ascii=False)),
+            )
+            rows = conn.execute(
+                "SELECT data FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+            ).fetchall()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return messages_from_dict([json.loads(r[0]) for r in rows])
+
+    def append(self, session_id: str, messages: List[AnyMessage]) -> None:
+        if not messages:
+            return
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            (seq,) = conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) FROM messages WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            conn.executemany(
+                "INSERT INTO messages (session_id, seq, data) VALUES (?, ?, ?)",
+                [
+                    (session_id, seq + 1 + i, json.dumps(d, ensure_ascii=False))
+                    for i, d in enumerate(messages_to_dict(messages))
+                ],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
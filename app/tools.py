@@ -16,7 +16,8 @@ def build_tools(
                 print(f"[TOOL] invoke: {action_name_follow} args={kwargs}")
             else:
                 print(f"[TOOL] invoke: {action_name_follow}")
-            robot.send(action_name_follow)
+            if not robot.send(action_name_follow):
+                print(f"[TOOL] suppressed duplicate: {action_name_follow}")
             return "OK"
         except Exception as e:
             # Avoid crashing the chat flow if robot connection fails
@@ -29,7 +30,8 @@ def build_tools(
                 print(f"[TOOL] invoke: {action_name_block} args={kwargs}")
             else:
                 print(f"[TOOL] invoke: {action_name_block}")
-            robot.send(action_name_block)
+            if not robot.send(action_name_block):
+                print(f"[TOOL] suppressed duplicate: {action_name_block}")
             return "OK"
         except Exception as e:
             # Avoid crashing the chat flow if robot connection fails
@@ -42,7 +44,8 @@ def build_tools(
                 print(f"[TOOL] invoke: {action_name_research} args={kwargs}")
             else:
                 print(f"[TOOL] invoke: {action_name_research}")
-            robot.send(action_name_research)
+            if not robot.send(action_name_research):
+                print(f"[TOOL] suppressed duplicate: {action_name_research}")
             return "OK"
         except Exception as e:
             # Avoid crashing the chat flow if robot connection fails
@@ -58,15 +61,18 @@ def build_tools(
             # Simple normalization for Korean/English synonyms
             if any(k in norm for k in ["따라", "follow"]):
                 print(f"[TOOL] dispatch(tool_use) -> {action_name_follow}")
-                robot.send(action_name_follow)
+                if not robot.send(action_name_follow):
+                    print(f"[TOOL] suppressed duplicate: {action_name_follow}")
                 return "OK"
             if any(k in norm for k in ["막", "block"]):
                 print(f"[TOOL] dispatch(tool_use) -> {action_name_block}")
-                robot.send(action_name_block)
+                if not robot.send(action_name_block):
+                    print(f"[TOOL] suppressed duplicate: {action_name_block}")
                 return "OK"
             if any(k in norm for k in ["탐색", "수색", "research", "scan", "explore"]):
                 print(f"[TOOL] dispatch(tool_use) -> {action_name_research}")
-                robot.send(action_name_research)
+                if not robot.send(action_name_research):
+                    print(f"[TOOL] suppressed duplicate: {action_name_research}")
                 return "OK"
             msg = f"Unknown tool name: {name}"
             print(f"[TOOL][warn] {msg}")
@@ -0,0 +1,195 @@
+import json
+import struct
+from typing import Any, List, Optional, Tuple
+
+
+# Binary frame: header = magic(u8) kind(u8) payload_len(u32), then payload.
+# MAGIC (0xB2) is a UTF-8 continuation byte, so it can never start a JSON/text
+# packet; receivers use it to tell the two formats apart per packet.
+MAGIC = 0xB2
+KIND_COMMAND = 1  # payload = value(i32) + name(utf-8)
+KIND_OBJECT = 2  # payload = tagged value (see _encode_value)
+
+_HDR = struct.Struct("<BBI")
+_CMD = struct.Struct("<i")
+
+WIRE_JSON = "json"
+WIRE_BINARY = "binary"
+WIRE_FORMATS = (WIRE_JSON, WIRE_BINARY)
+
+# Value tags
+_T_NONE, _T_FALSE, _T_TRUE, _T_INT, _T_FLOAT, _T_STR, _T_LIST, _T_DICT, _T_FARRAY = range(9)
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_INT_MIN, _INT_MAX = -(1 << 63), (1 << 63) - 1
+
+
+class WireError(ValueError):
+    pass
+
+
+def is_binary(data: bytes) -> bool:
+    return len(data) > 0 and data[0] == MAGIC
+
+
+# --- encode ---
+def encode_command(name: str, value: int = 1, wire_format: str = WIRE_JSON) -> bytes:
+    if wire_format not in WIRE_FORMATS:
+        raise WireError(f"unknown wire format: {wire_format}")
+    if wire_format == WIRE_BINARY:
+        payload = _CMD.pack(value) + name.encode("utf-8")
+        return _HDR.pack(MAGIC, KIND_COMMAND, len(payload)) + payload
+    return json.dumps({"name": name, "value": value}, ensure_ascii=False).encode("utf-8")
+
+
+def encode(obj: Any, wire_format: str = WIRE_JSON) -> bytes:
+    if wire_format not in WIRE_FORMATS:
+        raise WireError(f"unknown wire format: {wire_format}")
+    if wire_format == WIRE_BINARY:
+        buf = bytearray(_HDR.size)
+        _encode_value(obj, buf)
+        _HDR.pack_into(buf, 0, MAGIC, KIND_OBJECT, len(buf) - _HDR.size)
+        return bytes(buf)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _encode_value(v: Any, buf: bytearray) -> None:
+    # bool before int: bool is a subclass of int
+    if v is None:
+        buf.append(_T_NONE)
+    elif v is True:
+        buf.append(_T_TRUE)
+    elif v is False:
+        buf.append(_T_FALSE)
+    elif isinstance(v, int):
+        if not _INT_MIN <= v <= _INT_MAX:
+            raise WireError(f"int out of range: {v}")
+        buf.append(_T_INT)
+        buf += _I64.pack(v)
+    elif isinstance(v, float):
+        buf.append(_T_FLOAT)
+        buf += _F64.pack(v)
+    elif isinstance(v, str):
+        b = v.encode("utf-8")
+        buf.append(_T_STR)
+        buf += _U32.pack(len(b))
+        buf += b
+    elif isinstance(v, dict):
+        buf.append(_T_DICT)
+        buf += _U32.pack(len(v))
+        for k, item in v.items():
+            kb = str(k).encode("utf-8")
+            buf += _U16.pack(len(kb))
+            buf += kb
+            _encode_value(item, buf)
+    elif isinstance(v, (list, tuple)):
+        # Telemetry vectors (joint angles, IMU, ...) are packed in one struct call
+        if v and all(type(x) is float for x in v):
+            buf.append(_T_FARRAY)
+            buf += _U32.pack(len(v))
+            buf += struct.pack(f"<{len(v)}d", *v)
+        else:
+            buf.append(_T_LIST)
+            buf += _U32.pack(len(v))
+            for item in v:
+                _encode_value(item, buf)
+    else:
+        raise WireError(f"unsupported type: {type(v).__name__}")
+
+
+# --- decode ---
+def decode(data: bytes) -> Any:
+    """Decode one packet, auto-detecting binary frames vs UTF-8 JSON text.
+
+    Raises ``WireError`` for malformed binary frames and ``ValueError`` for
+    text that is not JSON.
+    """
+    if not is_binary(data):
+        return json.loads(data.decode("utf-8", errors="replace").strip())
+    if len(data) < _HDR.size:
+        raise WireError("truncated header")
+    _, kind, length = _HDR.unpack_from(data, 0)
+    end = _HDR.size + length
+    if len(data) < end:
+        raise WireError("truncated payload")
+    if kind == KIND_COMMAND:
+        if length < _CMD.size:
+            raise WireError("truncated command")
+        (value,) = _CMD.unpack_from(data, _HDR.size)
+        try:
+            name = bytes(data[_HDR.size + _CMD.size:end]).decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise WireError(f"malformed command name: {e}") from e
+        return {"name": name, "value": value}
+    if kind == KIND_OBJECT:
+        try:
+            obj, pos = _decode_value(data, _HDR.size)
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            raise WireError(f"malformed object: {e}") from e
+        if pos != end:
+            raise WireError("trailing bytes in object frame")
+        return obj
+    raise WireError(f"unknown frame kind: {kind}")
+
+
+def _decode_value(data: bytes, pos: int) -> Tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag == _T_NONE:
+        return None, pos
+    if tag == _T_TRUE:
+        return True, pos
+    if tag == _T_FALSE:
+        return False, pos
+    if tag == _T_INT:
+        return _I64.unpack_from(data, pos)[0], pos + 8
+    if tag == _T_FLOAT:
+        return _F64.unpack_from(data, pos)[0], pos + 8
+    if tag == _T_STR:
+        (n,) = _U32.unpack_from(data, pos)
+        pos += 4
+        return bytes(data[pos:pos + n]).decode("utf-8"), pos + n
+    if tag == _T_DICT:
+        (n,) = _U32.unpack_from(data, pos)
+        pos += 4
+        out = {}
+        for _ in range(n):
+            (kn,) = _U16.unpack_from(data, pos)
+            pos += 2
+            key = bytes(data[pos:pos + kn]).decode("utf-8")
+            out[key], pos = _decode_value(data, pos + kn)
+        return out, pos
+    if tag == _T_FARRAY:
+        (n,) = _U32.unpack_from(data, pos)
+        pos += 4
+        return list(struct.unpack_from(f"<{n}d", data, pos)), pos + 8 * n
+    if tag == _T_LIST:
+        (n,) = _U32.unpack_from(data, pos)
+        pos += 4
+        items: List[Any] = []
+        for _ in range(n):
+            item, pos = _decode_value(data, pos)
+            items.append(item)
+        return items, pos
+    raise WireError(f"unknown value tag: {tag}")
+
+
+def next_frame(buf: bytes) -> Tuple[Optional[bytes], bytes]:
+    """Split one message off a TCP stream buffer.
+
+    Binary frames are length-prefixed; text messages end at a newline.
+    Returns ``(None, buf)`` when the buffer holds no complete message yet.
+    """
+    if is_binary(buf):
+        if len(buf) < _HDR.size:
+            return None, buf
+        end = _HDR.size + _HDR.unpack_from(buf, 0)[2]
+        if len(buf) < end:
+            return None, buf
+        return buf[:end], buf[end:]
+    if b"\n" in buf:
+        line, rest = buf.split(b"\n", 1)
+        return line, rest
+    return None, buf
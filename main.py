@@ -1,31 +1,94 @@
 import os
-from fastapi import FastAPI, Request
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+from fastapi import FastAPI, Header, Request
 from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
-from app.graph import GraphManager
 from app.config import Settings
+from app.dedup import SqliteDedupTable, dedup_table
+from app.broker import BrokerBus
 from app.events import EventBus
+from app.journal import journal_from_settings
 from app.robot_server import RobotEventServer
 
+if TYPE_CHECKING:
+    from app.graph import GraphManager
+
 
+_t0 = time.perf_counter()
 settings = Settings()
-graph_manager = GraphManager(settings)
-event_bus = EventBus()
-robot_event_server = RobotEventServer(
-    host=settings.event_listen_host,
-    port=settings.event_listen_port,
-    transport=settings.event_transport,
-    bus=event_bus,
+if settings.event_broker_socket:
+    # uvicorn worker in multi-worker mode: the ingest process (app/broker.py)
+    # owns the robot listener and journal; events arrive over the broker socket.
+    event_journal = None
+    event_bus: EventBus = BrokerBus(settings.event_broker_socket)
+    robot_event_server: Optional[RobotEventServer] = None
+else:
+    event_journal = journal_from_settings(settings)
+    event_bus = EventBus(journal=event_journal)
+    robot_event_server = RobotEventServer(
+        host=settings.event_listen_host,
+        port=settings.event_listen_port,
+        transport=settings.event_transport,
+        bus=event_bus,
+    )
+
+# Replies by (session, client idempotency key) so browser retries don't re-run the turn.
+# With SESSION_DB set (multi-worker mode) the table lives in that SQLite file so a
+# retry landing on another worker is still suppressed.
+chat_dedup = dedup_table(settings.idempotency_ttl_s, "chat", settings.session_db)
+# Shared robot dispatch counters, readable before this worker has built its graph
+robot_dedup_shared: Optional[SqliteDedupTable] = (
+    SqliteDedupTable(settings.session_db, settings.dispatch_debounce_ms / 1000.0, "robot")
+    if settings.session_db
+    else None
 )
 
 app = FastAPI(title="Go2 Control Chat (LangGraph + Ollama)")
 
 
+# GraphManager pulls in langchain/langgraph/langchain_ollama and compiles the
+# graph, which takes seconds. Build it lazily so /events and /robot/event are
+# served as soon as uvicorn binds.
+_graph_manager: Optional["GraphManager"] = None
+_graph_lock = threading.Lock()
+_graph_error: Optional[str] = None
+_graph_ready_s: Optional[float] = None
+
+
+def get_graph_manager() -> "GraphManager":
+    global _graph_manager, _graph_error, _graph_ready_s
+    if _graph_manager is None:
+        with _graph_lock:
+            if _graph_manager is None:
+                try:
+                    from app.graph import GraphManager
+
+                    _graph_manager = GraphManager(settings)
+                    _graph_error = None
+                    _graph_ready_s = time.perf_counter() - _t0
+                    print(f"[LLM] graph ready ({_graph_ready_s:.2f}s since import)")
+                except Exception as e:
+                    _graph_error = str(e)
+                    raise
+    return _graph_manager
+
+
+def _warm_graph() -> None:
+    try:
+        get_graph_manager()
+    except Exception as e:
+        print(f"[LLM][init][error] {e}")
+
+
 class ChatRequest(BaseModel):
     session_id: str = "default"
     message: str
+    idempotency_key: Optional[str] = None
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -35,9 +98,15 @@ def index():
 
 
 @app.post("/chat")
-def chat(req: ChatRequest):
+def chat(req: ChatRequest, idempotency_key: Optional[str] = Header(default=None)):
+    key = req.idempotency_key or idempotency_key
     try:
-        content = graph_manager.chat(req.session_id, req.message)
+        if key:
+            content = chat_dedup.run(
+                f"{req.session_id}:{key}", lambda: get_graph_manager().chat(req.session_id, req.message)
+            )
+        else:
+            content = get_graph_manager().chat(req.session_id, req.message)
         return JSONResponse({"reply": content})
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -45,18 +114,65 @@ def chat(req: ChatRequest):
 
 @app.on_event("startup")
 async def _on_startup():
+    if event_journal is not None:
+        event_journal.start()
     # Start socket server for robot events
-    robot_event_server.start()
+    if robot_event_server is not None:
+        robot_event_server.start()
+    if isinstance(event_bus, BrokerBus):
+        event_bus.start()
+    if settings.llm_eager_init:
+        # Off the event loop so startup completes immediately
+        threading.Thread(target=_warm_graph, daemon=True).start()
 
 
 @app.on_event("shutdown")
 async def _on_shutdown():
-    robot_event_server.stop()
+    if robot_event_server is not None:
+        robot_event_server.stop()
+    if isinstance(event_bus, BrokerBus):
+        event_bus.stop()
+    if event_journal is not None:
+        event_journal.stop()
+
+
+@app.get("/ready")
+def ready():
+    # 200 once the LLM graph is built; 503 while it is still loading (or failed)
+    body = {
+        "ready": _graph_manager is not None,
+        "graph_ready_s": _graph_ready_s,
+        "error": _graph_error,
+    }
+    return JSONResponse(status_code=200 if body["ready"] else 503, content=body)
+
+
+@app.get("/metrics")
+def metrics():
+    return JSONResponse({
+        "chat_idempotency": chat_dedup.stats(),
+        "robot_dispatch": (
+            robot_dedup_shared.stats() if robot_dedup_shared is not None
+            else _graph_manager.robot.dedup.stats() if _graph_manager is not None
+            else None
+        ),
+    })
 
 
 # Robot pushes asynchronous events (e.g., research results) here.
 @app.post("/robot/event")
 async def robot_event(request: Request):
+    return await _publish_event(request, record=True)
+
+
+# scripts/replay_journal.py re-injects journaled events here; they are
+# already in the journal, so they are fanned out without being recorded again.
+@app.post("/robot/event/replay")
+async def robot_event_replay(request: Request):
+    return await _publish_event(request, record=False)
+
+
+async def _publish_event(request: Request, record: bool):
     try:
         data = await request.json()
     except Exception:
@@ -66,8 +182,8 @@ async def robot_event(request: Request):
         return JSONResponse(status_code=400, content={"error": "Body must be a JSON object"})
     kind = data.get("kind") or data.get("type") or "robot_event"
     data["kind"] = kind
-    event_bus.publish(data)
-    print(f"[ROBOT][event] {data}")
+    event_bus.publish(data, record=record)
+    print(f"[ROBOT][event]{'' if record else '[replay]'} {data}")
     return JSONResponse({"ok": True})
 
 
@@ -96,12 +212,28 @@ async def events():
 
 def run():
     import uvicorn
-    uvicorn.run(
-        app,
-        host=os.environ.get("HOST", "0.0.0.0"),
-        port=int(os.environ.get("PORT", "8000")),
-        reload=False,
+    host = os.environ.get("HOST", "0.0.0.0")
+    port = int(os.environ.get("PORT", "8000"))
+    if settings.web_workers <= 1:
+        uvicorn.run(app, host=host, port=port, reload=False)
+        return
+
+    # Multi-worker: workers re-import this module and pick these up via Settings()
+    import multiprocessing
+    import tempfile
+    from app.broker import run_ingest
+
+    os.environ.setdefault("SESSION_DB", "sessions.db")
+    os.environ.setdefault(
+        "EVENT_BROKER_SOCKET", os.path.join(tempfile.gettempdir(), f"go2-events-{os.getpid()}.sock")
     )
+    ingest = multiprocessing.Process(target=run_ingest, args=(Settings(),), name="event-ingest", daemon=True)
+    ingest.start()
+    try:
+        uvicorn.run("main:app", host=host, port=port, workers=settings.web_workers, reload=False)
+    finally:
+        ingest.terminate()
+        ingest.join(timeout=5.0)
 
 
 if __name__ == "__main__":
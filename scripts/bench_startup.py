@@ -0,0 +1,87 @@
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def _free_port(kind: int = socket.SOCK_STREAM) -> int:
+    with socket.socket(socket.AF_INET, kind) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def bench_import(runs: int) -> float:
+    # Fresh interpreter per run so nothing is cached in sys.modules
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import main"], cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def _status(url: str) -> int | None:
+    try:
+        with urllib.request.urlopen(url, timeout=0.5) as res:
+            return res.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except Exception:
+        return None
+
+
+def bench_ready(timeout: float) -> tuple[float | None, float | None]:
+    """Return (time to first HTTP response, time until /ready is 200)."""
+    port = _free_port()
+    env = dict(
+        os.environ,
+        HOST="127.0.0.1",
+        PORT=str(port),
+        EVENT_LISTEN_HOST="127.0.0.1",
+        EVENT_LISTEN_PORT=str(_free_port(socket.SOCK_DGRAM)),
+        EVENT_TRANSPORT="udp",
+    )
+    url = f"http://127.0.0.1:{port}/ready"
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "main.py"], cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    serving = ready = None
+    try:
+        while time.perf_counter() - start < timeout:
+            code = _status(url)
+            if code is not None and serving is None:
+                serving = time.perf_counter() - start
+            if code == 200:
+                ready = time.perf_counter() - start
+                break
+            time.sleep(0.01)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=5)
+    return serving, ready
+
+
+def _fmt(v: float | None) -> str:
+    return f"{v * 1000:8.1f} ms" if v is not None else "  timeout"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure import time and time-to-ready of main.py")
+    parser.add_argument("--runs", type=int, default=5, help="Import runs (median reported)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Max seconds to wait for /ready")
+    args = parser.parse_args()
+
+    print(f"import main      : {bench_import(args.runs) * 1000:8.1f} ms (median of {args.runs})")
+    serving, ready = bench_ready(args.timeout)
+    print(f"first response   : {_fmt(serving)}")
+    print(f"/ready == 200    : {_fmt(ready)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+import time
+from typing import Any, Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.wire import WIRE_BINARY, WIRE_JSON, decode, encode, encode_command  # noqa: E402
+
+
+COMMAND = ("research", 1)
+
+TELEMETRY = {
+    "kind": "telemetry",
+    "seq": 123456,
+    "ts": 1760000000.123456,
+    "battery": 87.5,
+    "mode": "walk",
+    "pos": [1.2345678, -0.9876543, 0.3125],
+    "rpy": [0.0123, -0.0456, 1.5707963],
+    "joints": [0.1 * i + 0.001 for i in range(12)],
+    "foot_force": [12.5, 13.25, 11.75, 12.0],
+    "obstacle": False,
+}
+
+
+def _time(fn: Callable[[], Any], n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare JSON vs binary wire encoding")
+    parser.add_argument("-n", type=int, default=100000, help="Iterations per measurement")
+    args = parser.parse_args()
+
+    print(f"{'payload':<10} {'format':<7} {'bytes':>6} {'enc us':>8} {'dec us':>8}")
+    for fmt in (WIRE_JSON, WIRE_BINARY):
+        data = encode_command(*COMMAND, wire_format=fmt)
+        enc = _time(lambda: encode_command(*COMMAND, wire_format=fmt), args.n)
+        dec = _time(lambda: decode(data), args.n)
+        print(f"{'command':<10} {fmt:<7} {len(data):>6} {enc:>8.2f} {dec:>8.2f}")
+    for fmt in (WIRE_JSON, WIRE_BINARY):
+        data = encode(TELEMETRY, fmt)
+        assert decode(data) == TELEMETRY
+        enc = _time(lambda: encode(TELEMETRY, fmt), args.n)
+        dec = _time(lambda: decode(data), args.n)
+        print(f"{'telemetry':<10} {fmt:<7} {len(data):>6} {enc:>8.2f} {dec:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.events import EventBus  # noqa: E402
+from app.journal import JournalReader, replay  # noqa: E402
+
+
+class _HttpBus(EventBus):
+    """EventBus stand-in that forwards each event to a running server's /robot/event/replay."""
+
+    def __init__(self, url: str) -> None:
+        super().__init__()
+        self.url = url.rstrip("/") + "/robot/event/replay"
+
+    def publish(self, data, record: bool = True) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        req = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=3) as res:
+                res.read()
+        except Exception as e:
+            print(f"[REPLAY][post][err] {e}")
+
+
+async def _run(args: argparse.Namespace) -> None:
+    with JournalReader(args.dir) as reader:
+        if args.from_id is not None or args.to_id is not None:
+            records = reader.scan_ids(args.from_id or 0, args.to_id)
+        else:
+            records = reader.scan_time(args.since, args.until)
+
+        if args.url:
+            bus: EventBus = _HttpBus(args.url)
+            printer = None
+        else:
+            bus = EventBus()
+            q = bus.subscribe()
+
+            async def _print() -> None:
+                while True:
+                    item = await q.get()
+                    print("[REPLAY]", json.dumps(item, ensure_ascii=False))
+
+            printer = asyncio.create_task(_print())
+
+        started = time.monotonic()
+        count = await replay(records, bus, speed=args.speed)
+        if printer is not None:
+            while not q.empty():
+                await asyncio.sleep(0.01)
+            printer.cancel()
+        print(f"[REPLAY] {count} events in {time.monotonic() - started:.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay an event journal into an EventBus")
+    parser.add_argument("--dir", required=True, help="Journal directory (EVENT_JOURNAL_DIR)")
+    parser.add_argument("--since", type=float, default=None, help="Start time (epoch seconds)")
+    parser.add_argument("--until", type=float, default=None, help="End time (epoch seconds, exclusive)")
+    parser.add_argument("--from-id", type=int, default=None, help="First event id")
+    parser.add_argument("--to-id", type=int, default=None, help="Last event id (inclusive)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed multiplier; 0 = as fast as possible")
+    parser.add_argument("--url", default=None, help="Post events to a running server, e.g. http://localhost:8000")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        print("\nStopped.")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
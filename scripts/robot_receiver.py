@@ -1,16 +1,29 @@
 import argparse
 import json
+import os
 import socket
 import sys
 from typing import Tuple
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.wire import decode, is_binary, next_frame  # noqa: E402
+
 
 def print_payload(prefix: str, data: bytes, addr: Tuple[str, int] | None = None) -> None:
+    where = f" from {addr[0]}:{addr[1]}" if addr else ""
+    if is_binary(data):
+        print(f"[RECV]{where} {len(data)} bytes: <binary> {data.hex(' ')}")
+        try:
+            obj = decode(data)
+            print("        as binary:", json.dumps(obj, ensure_ascii=False))
+        except Exception as e:
+            print(f"        [binary][err] {e}")
+        return
     try:
         text = data.decode("utf-8", errors="replace")
     except Exception:
         text = repr(data)
-    where = f" from {addr[0]}:{addr[1]}" if addr else ""
     print(f"[RECV]{where} {len(data)} bytes: {text}")
     # Try to pretty-print JSON if applicable
     try:
@@ -47,7 +60,14 @@ def run_tcp(host: str, port: int) -> None:
                         break
                     chunks.append(buf)
                 data = b"".join(chunks)
-                print_payload("TCP", data, addr)
+                # A connection may carry several binary frames back to back
+                while is_binary(data):
+                    frame, data = next_frame(data)
+                    if frame is None:
+                        break
+                    print_payload("TCP", frame, addr)
+                if data:
+                    print_payload("TCP", data, addr)
 
 
 def main() -> None: